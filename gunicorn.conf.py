@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the Product Store Service
+
+Every endpoint spends most of its time waiting on PostgreSQL, so the
+workers are cooperative gevent workers instead of the default sync ones.
+"""
+# pylint: disable=invalid-name
+# Exactly one worker: service/routes.py caches responses in process memory,
+# so a write on one worker would leave stale reads cached on the others.
+# Concurrency comes from the gevent connections below instead of -w 4.
+workers = 1
+worker_class = "gevent"
+worker_connections = 1000
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Makes psycopg2 yield to other greenlets while it waits on the database"""
+    # psycopg2 is a C extension, so gevent's monkey patching does not reach it
+    from psycogreen.gevent import patch_psycopg  # pylint: disable=import-outside-toplevel
+
+    patch_psycopg()
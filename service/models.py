@@ -31,6 +31,7 @@ available (boolean) - True for products that are available for adoption
 import logging
 from enum import Enum
 from decimal import Decimal
+import msgspec
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 
@@ -45,6 +46,18 @@ def init_db(app):
     Product.init_db(app)
 
 
+def product_row_to_dict(product_id, name, description, price, available, category) -> dict:
+    """Builds the serialized form of a Product from its column values"""
+    return {
+        "id": product_id,
+        "name": name,
+        "description": description,
+        "price": str(price),
+        "available": available,
+        "category": category.name  # convert enum to string
+    }
+
+
 class DataValidationError(Exception):
     """Used for an data validation errors when deserializing"""
 
@@ -60,6 +73,20 @@ class Category(Enum):
     TOOLS = 5
 
 
+class ProductSchema(msgspec.Struct):
+    """Shape of a Product in a JSON request body"""
+
+    name: str
+    description: str
+    price: Decimal
+    available: bool
+    category: str
+
+
+# Built once so each request only pays for the decode itself
+_PRODUCT_DECODER = msgspec.json.Decoder(ProductSchema)
+
+
 class Product(db.Model):
     """
     Class that represents a Product
@@ -115,14 +142,34 @@ class Product(db.Model):
 
     def serialize(self) -> dict:
         """Serializes a Product into a dictionary"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "price": str(self.price),
-            "available": self.available,
-            "category": self.category.name  # convert enum to string
-        }
+        return product_row_to_dict(
+            self.id, self.name, self.description, self.price, self.available, self.category
+        )
+
+    @staticmethod
+    def serialize_many(products):
+        """Serializes many Products into dictionaries
+
+        The column values are read inline so there is no serialize() call per row
+
+        :param products: the Products to serialize
+        :type products: iterable
+
+        :return: a generator of serialized Products
+        :rtype: generator
+
+        """
+        return (
+            product_row_to_dict(
+                product.id,
+                product.name,
+                product.description,
+                product.price,
+                product.available,
+                product.category,
+            )
+            for product in products
+        )
 
     def deserialize(self, data: dict):
         """
@@ -131,28 +178,35 @@ class Product(db.Model):
             data (dict): A dictionary containing the Product data
         """
         try:
-            if isinstance(data["available"], bool):
-                self.name = data["name"]
-                self.description = data["description"]
-                self.price = Decimal(data["price"])
-                self.available = data["available"]
-                self.category = getattr(Category, data["category"])  # create enum from string
-                return self
-
-            else:
-                raise DataValidationError(
-                    "Invalid type for boolean [available]: "
-                    + str(type(data["available"]))
-                )
-            
-        except AttributeError as error:
-            raise DataValidationError("Invalid attribute: " + error.args[0]) from error
+            schema = msgspec.convert(data, ProductSchema)
+        except msgspec.ValidationError as error:
+            raise DataValidationError("Invalid product: " + str(error)) from error
+        return self._apply_schema(schema)
+
+    def deserialize_json(self, body: bytes):
+        """
+        Deserializes a Product from a JSON document
+        Args:
+            body (bytes): The raw JSON request body
+        """
+        try:
+            schema = _PRODUCT_DECODER.decode(body)
+        except msgspec.DecodeError as error:
+            raise DataValidationError("Invalid product: " + str(error)) from error
+        return self._apply_schema(schema)
+
+    def _apply_schema(self, schema: ProductSchema):
+        """Copies validated ProductSchema fields onto this Product"""
+        try:
+            category = Category[schema.category]  # create enum from string
         except KeyError as error:
-            raise DataValidationError("Invalid product: missing " + error.args[0]) from error
-        except TypeError as error:
-            raise DataValidationError(
-                "Invalid product: body of request contained bad or no data " + str(error)
-            ) from error
+            raise DataValidationError("Invalid attribute: " + schema.category) from error
+        self.name = schema.name
+        self.description = schema.description
+        self.price = schema.price
+        self.available = schema.available
+        self.category = category
+        return self
 
     ##################################################
     # CLASS METHODS
@@ -178,6 +232,23 @@ class Product(db.Model):
         logger.info("Processing all Products")
         return cls.query.all()
 
+    @classmethod
+    def all_serialized(cls):
+        """Yields every Product as a serialized dictionary
+
+        The columns are selected directly so no ORM instances are built
+
+        :return: a generator of serialized Products
+        :rtype: generator
+
+        """
+        logger.info("Processing all Products as rows")
+        statement = db.select(
+            cls.id, cls.name, cls.description, cls.price, cls.available, cls.category
+        ).execution_options(yield_per=200)
+        for row in db.session.execute(statement):
+            yield product_row_to_dict(*row)
+
     @classmethod
     def find(cls, product_id: int):
         """Finds a Product by it's ID
@@ -190,7 +261,23 @@ class Product(db.Model):
 
         """
         logger.info("Processing lookup for id %s ...", product_id)
-        return cls.query.get(product_id)
+        return db.session.get(cls, product_id)
+
+    @classmethod
+    def delete_by_id(cls, product_id: int) -> bool:
+        """Removes a Product by it's ID in a single DELETE statement
+
+        :param product_id: the id of the Product to delete
+        :type product_id: int
+
+        :return: True if a Product was deleted, False if not found
+        :rtype: bool
+
+        """
+        logger.info("Deleting id %s ...", product_id)
+        result = db.session.execute(db.delete(cls).where(cls.id == product_id))
+        db.session.commit()
+        return result.rowcount > 0
 
     @classmethod
     def find_by_name(cls, name: str) -> list:
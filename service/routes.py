@@ -14,24 +14,71 @@
 # limitations under the License.
 ######################################################################
 
-# spell: ignore Rofrano jsonify restx dbname
+# spell: ignore Rofrano jsonify restx dbname orjson
 """
 Product Store Service with UI
 """
-from flask import jsonify, request, abort
+import os
+import hashlib
+from decimal import Decimal
+from enum import Enum
+import orjson
+from cachetools import TTLCache
+from flask import request, abort
 from flask import url_for  # noqa: F401 pylint: disable=unused-import
 from service.models import Product, Category
 from service.common import status  # HTTP Status Codes
 from . import app
 
 
+def _json_default(obj):
+    """Encodes the types orjson does not handle natively"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.name
+    raise TypeError
+
+
+def _json_dumps(payload) -> bytes:
+    """Encodes a payload to JSON bytes with orjson"""
+    return orjson.dumps(payload, default=_json_default)
+
+
+# (etag, body) pairs for the read endpoints, invalidated on every write.
+# They live in this process only, so a write on one gunicorn worker would
+# leave stale entries on the others: the service must run a single worker.
+_LIST_CACHE = TTLCache(maxsize=512, ttl=60)
+_ITEM_CACHE = TTLCache(maxsize=512, ttl=60)
+
+# Bumped on every write so a read that raced with it is not cached
+_cache_generation = 0  # pylint: disable=invalid-name
+
+# Endpoints whose request body must be application/json
+_JSON_ENDPOINTS = frozenset(("create_products", "update_products"))
+
+# Category names accepted by the list filter
+_CATEGORY_MAP = {category.name: category for category in Category}
+
+# Pre-encoded bodies for the empty list and not found responses
+_EMPTY_LIST = b"[]"
+_EMPTY_OBJECT = b"{}"
+
+# The health payload never changes, so it is encoded only once
+_HEALTH_BODY = _json_dumps({"status": status.HTTP_200_OK, "message": "OK"})
+
+# The home page is static, so read it from disk only once
+with open(os.path.join(app.static_folder, "index.html"), "rb") as index_file:
+    _INDEX_BYTES = index_file.read()
+
+
 ######################################################################
 # H E A L T H   C H E C K
 ######################################################################
 @app.route("/health")
 def healthcheck():
     """Let them know our heart is still beating"""
-    return jsonify(status=200, message="OK"), status.HTTP_200_OK
+    return _bytes_response(_HEALTH_BODY, status.HTTP_200_OK)
 
 
 ######################################################################
@@ -40,30 +87,61 @@ def healthcheck():
 @app.route("/")
 def index():
     """Base URL for our service"""
-    return app.send_static_file("index.html")
+    return app.response_class(_INDEX_BYTES, mimetype="text/html")
 
 
 ######################################################################
 #  U T I L I T Y   F U N C T I O N S
 ######################################################################
-def check_content_type(content_type):
-    """Checks that the media type is correct"""
-    if "Content-Type" not in request.headers:
-        app.logger.error("No Content-Type specified.")
+def _bytes_response(body, code, headers=None):
+    """Builds a JSON response from an already encoded body"""
+    return app.response_class(
+        body,
+        status=code,
+        mimetype="application/json",
+        headers=headers,
+    )
+
+
+def _json_response(payload, code, headers=None):
+    """Builds a JSON response encoded with orjson"""
+    return _bytes_response(_json_dumps(payload), code, headers)
+
+
+def _cache_entry(body):
+    """Pairs an encoded body with the ETag that identifies it"""
+    return hashlib.blake2s(body).hexdigest(), body
+
+
+def _conditional_response(entry):
+    """Builds a response for a cache entry, 304 if the client has it already"""
+    etag, body = entry
+    response = _bytes_response(body, status.HTTP_200_OK)
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def _invalidate_caches(product_id=None):
+    """Drops cached responses that a write may have made stale"""
+    global _cache_generation  # pylint: disable=global-statement,invalid-name
+    _cache_generation += 1
+    _LIST_CACHE.clear()
+    _ITEM_CACHE.pop(product_id, None)
+
+
+@app.before_request
+def _enforce_content_type():
+    """Rejects writes to the JSON endpoints that are not application/json"""
+    if request.endpoint not in _JSON_ENDPOINTS:
+        return
+    content_type = request.headers.get("Content-Type")
+    if content_type != "application/json":
+        app.logger.error("Invalid Content-Type: %s", content_type)
         abort(
             status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            f"Content-Type must be {content_type}",
+            "Content-Type must be application/json",
         )
 
-    if request.headers["Content-Type"] == content_type:
-        return
-
-    app.logger.error("Invalid Content-Type: %s", request.headers["Content-Type"])
-    abort(
-        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-        f"Content-Type must be {content_type}",
-    )
-
 
 ######################################################################
 # C R E A T E   A   N E W   P R O D U C T
@@ -74,14 +152,13 @@ def create_products():
     Creates a Product
     This endpoint will create a Product based the data in the body that is posted
     """
-    app.logger.info("Request to Create a Product...")
-    check_content_type("application/json")
+    app.logger.debug("Request to Create a Product...")
 
-    data = request.get_json()
-    app.logger.info("Processing: %s", data)
+    app.logger.debug("Processing %d bytes", request.content_length or 0)
     product = Product()
-    product.deserialize(data)
+    product.deserialize_json(request.get_data())
     product.create()
+    _invalidate_caches(product.id)
     app.logger.info("Product with new id [%s] saved!", product.id)
 
     message = product.serialize()
@@ -91,7 +168,7 @@ def create_products():
     #
     # location_url = url_for("get_products", product_id=product.id, _external=True)
     location_url = "/"  # delete once READ is implemented
-    return jsonify(message), status.HTTP_201_CREATED, {"Location": location_url}
+    return _json_response(message, status.HTTP_201_CREATED, {"Location": location_url})
 
 
 ######################################################################
@@ -101,50 +178,58 @@ def create_products():
 @app.route("/products", methods=["GET"])
 def list_products():
     """Returns a list of Products"""
-    app.logger.info("Request to list Products...")
-    # use the Product.all() method to retrieve all products
-    
-    # create a list of serialize() products
+    app.logger.debug("Request to list Products...")
     name = request.args.get("name")
     category = request.args.get("category")
     available = request.args.get("available")
 
+    cache_key = ("list", name, category, available)
+    entry = _LIST_CACHE.get(cache_key)
+    if entry is not None:
+        return _conditional_response(entry)
+
+    generation = _cache_generation
     if name:
-        products = Product.find_by_name(name)
-        final_products = [prod.serialize() for prod in products]
-        app.logger.info("[%s] Products final by name", len(final_products))
+        messages = Product.serialize_many(Product.find_by_name(name))
     elif category:
-        products = Product.find_by_category(getattr(Category,category))
-        final_products = [prod.serialize() for prod in products]
-        app.logger.info("[%s] Products final by category", len(final_products))    
+        category_value = _CATEGORY_MAP.get(category)
+        if category_value is None:
+            abort(status.HTTP_400_BAD_REQUEST, f"Unknown category: {category}")
+        messages = Product.serialize_many(Product.find_by_category(category_value))
     elif available:
-        products = Product.find_by_availability(available)
-        final_products = [prod.serialize() for prod in products]
-        app.logger.info("[%s] Products final by available", len(final_products))
+        messages = Product.serialize_many(Product.find_by_availability(available))
     else:
-        products = Product.all()
-        final_products = [prod.serialize() for prod in products]
-        # log the number of products being returned in the list 
-        app.logger.info("[%s] Products final", len(final_products))
-    # return the list with a return code of status.HTTP_200_OK
-    return final_products, status.HTTP_200_OK
-
+        # without a filter, read the columns straight into dictionaries
+        messages = Product.all_serialized()
+    # encode the whole list once so it can be cached with its ETag
+    rows = b",".join(map(_json_dumps, messages))
+    entry = _cache_entry(b"[" + rows + b"]" if rows else _EMPTY_LIST)
+    if generation == _cache_generation:
+        _LIST_CACHE[cache_key] = entry
+    return _conditional_response(entry)
 
 
 ######################################################################
 # R E A D   A   P R O D U C T
 ######################################################################
 
-@app.route("/products/<product_id>", methods=["GET"])
+@app.route("/products/<int:product_id>", methods=["GET"])
 def get_products(product_id):
     """
     retrieve specific product from database by id inside link
     """
-    app.logger.info("Request to Retrieve a Product...")
+    app.logger.debug("Request to Retrieve a Product...")
+    entry = _ITEM_CACHE.get(product_id)
+    if entry is not None:
+        return _conditional_response(entry)
+    generation = _cache_generation
     prods = Product.find(product_id)
     if not prods:
-        return {}, status.HTTP_404_NOT_FOUND
-    return prods.serialize(), status.HTTP_200_OK
+        return _bytes_response(_EMPTY_OBJECT, status.HTTP_404_NOT_FOUND)
+    entry = _cache_entry(_json_dumps(prods.serialize()))
+    if generation == _cache_generation:
+        _ITEM_CACHE[product_id] = entry
+    return _conditional_response(entry)
 
 
 
@@ -153,44 +238,40 @@ def get_products(product_id):
 # U P D A T E   A   P R O D U C T
 ######################################################################
 
-@app.route("/products/<product_id>", methods=["PUT"])
+@app.route("/products/<int:product_id>", methods=["PUT"])
 def update_products(product_id):
     """
     Update an Product
     This endpoint will update a Product based on the body that is posted
     """
-    app.logger.info("Request to Update a product with id [%s]", product_id)
-    check_content_type("application/json")
+    app.logger.debug("Request to Update a product with id [%s]", product_id)
     prod_upt = Product.find(product_id)
     # abort() with a status.HTTP_404_NOT_FOUND if it cannot be found
     if not prod_upt:
-        return {}, status.HTTP_404_NOT_FOUND
-    try:
-        prod_upt.deserialize(request.get_json())
-        prod_upt.update()
-        return prod_upt.serialize(), status.HTTP_200_OK
-    except TypeError:
-        return {}, status.HTTP_400_BAD_REQUEST
+        return _bytes_response(_EMPTY_OBJECT, status.HTTP_404_NOT_FOUND)
+    prod_upt.deserialize_json(request.get_data())
+    # serialize before the commit expires the instance and forces a reload
+    message = prod_upt.serialize()
+    prod_upt.update()
+    _invalidate_caches(product_id)
+    return _json_response(message, status.HTTP_200_OK)
 
 ######################################################################
 # D E L E T E   A   P R O D U C T
 ######################################################################
 
 
-@app.route("/products/<product_id>", methods=["DELETE"])
+@app.route("/products/<int:product_id>", methods=["DELETE"])
 def delete_products(product_id):
     """
     Delete a Product
     This endpoint will delete a Product based the id specified in the path
     """
-    app.logger.info("Request to Delete a product with id [%s]", product_id)
-    # use the Product.find() method to retrieve the product by the product_id
-    prod_upt = Product.find(product_id)
-    # abort() with a status.HTTP_404_NOT_FOUND if it cannot be found
-    if not prod_upt:
-        return {}, status.HTTP_404_NOT_FOUND
+    app.logger.debug("Request to Delete a product with id [%s]", product_id)
+    # delete the product in one statement, 404 if nothing was removed
+    if not Product.delete_by_id(product_id):
+        return _bytes_response(_EMPTY_OBJECT, status.HTTP_404_NOT_FOUND)
 
-    # if found, call the delete() method on the product
-    prod_upt.delete()
+    _invalidate_caches(product_id)
     # return and empty body ("") with a return code of status.HTTP_204_NO_CONTENT
-    return {}, status.HTTP_204_NO_CONTENT
+    return _bytes_response(b"", status.HTTP_204_NO_CONTENT)
@@ -27,7 +27,7 @@ import os
 import logging
 import unittest
 from decimal import Decimal
-from service.models import Product, Category, db
+from service.models import Product, Category, DataValidationError, db
 from service import app
 from tests.factories import ProductFactory
 
@@ -163,6 +163,16 @@ class TestProductModel(unittest.TestCase):
         product.delete()
         self.assertEqual(len(Product.all()), 0)
 
+    def test_delete_a_product_by_id(self):
+        """It should Delete a Product by its id"""
+        product = ProductFactory()
+        product.create()
+        self.assertEqual(len(Product.all()), 1)
+        self.assertTrue(Product.delete_by_id(product.id))
+        self.assertEqual(len(Product.all()), 0)
+        # a second delete finds nothing to remove
+        self.assertFalse(Product.delete_by_id(product.id))
+
     def test_list_all_products(self):
         """It should List all Products in the database"""
         products = Product.all()
@@ -175,6 +185,22 @@ class TestProductModel(unittest.TestCase):
         products = Product.all()
         self.assertEqual(len(products), 5)
 
+    def test_list_all_products_serialized(self):
+        """It should List all Products as serialized dictionaries"""
+        self.assertEqual(list(Product.all_serialized()), [])
+        for _ in range(5):
+            product = ProductFactory()
+            product.create()
+        serialized = list(Product.all_serialized())
+        self.assertEqual(len(serialized), 5)
+        self.assertEqual(serialized, [product.serialize() for product in Product.all()])
+
+    def test_serialize_many_products(self):
+        """It should Serialize many Products like serialize() does"""
+        products = ProductFactory.build_batch(3)
+        serialized = list(Product.serialize_many(products))
+        self.assertEqual(serialized, [product.serialize() for product in products])
+
     def test_find_by_name(self):
         """It should Find a Product by Name"""
         products = ProductFactory.create_batch(5)
@@ -233,6 +259,35 @@ class TestProductModel(unittest.TestCase):
         except :
             self.assertNotEqual(prod.name,data_test["name"])
 
+    def test_deserialize(self):
+        """It should Deserialize a Product from a dictionary"""
+        data = ProductFactory().serialize()
+        product = Product().deserialize(data)
+        self.assertEqual(product.name, data["name"])
+        self.assertEqual(product.price, Decimal(data["price"]))
+        self.assertEqual(product.category.name, data["category"])
+        self.assertRaises(DataValidationError, product.deserialize, {**data, "category": "SHOES"})
+
+    def test_deserialize_json(self):
+        """It should Deserialize a Product from a JSON body"""
+        body = b'{"name": "Hat", "description": "A red hat", "price": "12.50", "available": true, "category": "CLOTHS"}'
+        product = Product().deserialize_json(body)
+        self.assertEqual(product.name, "Hat")
+        self.assertEqual(product.description, "A red hat")
+        self.assertEqual(product.price, Decimal("12.50"))
+        self.assertEqual(product.available, True)
+        self.assertEqual(product.category, Category.CLOTHS)
+
+    def test_fail_deserialize_json(self):
+        """It should not Deserialize a bad JSON body"""
+        product = Product()
+        self.assertRaises(DataValidationError, product.deserialize_json, b"not json")
+        self.assertRaises(DataValidationError, product.deserialize_json, b'{"name": "Hat"}')
+        body = b'{"name": "Hat", "description": "A red hat", "price": "12.50", "available": "yes", "category": "CLOTHS"}'
+        self.assertRaises(DataValidationError, product.deserialize_json, body)
+        body = b'{"name": "Hat", "description": "A red hat", "price": "12.50", "available": true, "category": "SHOES"}'
+        self.assertRaises(DataValidationError, product.deserialize_json, body)
+
     def test_find_by_price(self):
         """It should Find a Product by price"""
         products = ProductFactory.create_batch(5)
@@ -29,7 +29,7 @@ import logging
 from decimal import Decimal
 from urllib.parse import quote_plus
 from unittest import TestCase
-from service import app
+from service import app, routes
 from service.common import status
 from service.models import db, init_db, Product
 from tests.factories import ProductFactory
@@ -72,6 +72,7 @@ class TestProductRoutes(TestCase):
         self.client = app.test_client()
         db.session.query(Product).delete()  # clean up the last tests
         db.session.commit()
+        routes._invalidate_caches()  # pylint: disable=protected-access
 
     def tearDown(self):
         db.session.remove()
@@ -93,6 +94,13 @@ class TestProductRoutes(TestCase):
             products.append(test_product)
         return products
 
+    def _create_products_bulk(self, count: int = 1) -> list:
+        """Factory method to insert products in bulk straight into the database"""
+        products = ProductFactory.build_batch(count, id=None)
+        db.session.add_all(products)
+        db.session.commit()
+        return products
+
     ############################################################
     #  T E S T   C A S E S
     ############################################################
@@ -164,6 +172,12 @@ class TestProductRoutes(TestCase):
         response = self.client.post(BASE_URL, data={}, content_type="plain/text")
         self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
 
+    def test_update_product_wrong_content_type(self):
+        """It should not Update a Product with wrong Content-Type"""
+        prod = self._create_products_bulk()[0]
+        response = self.client.put(f"{BASE_URL}/{prod.id}", data={}, content_type="plain/text")
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
     #
     # ADD YOUR TEST CASES HERE
     #
@@ -187,33 +201,59 @@ class TestProductRoutes(TestCase):
         self.assertEqual(result_read.status_code, status.HTTP_200_OK)
         self.assertEqual(result_read.get_json(), test_product.serialize())
 
+    def test_read_product_not_modified(self):
+        """it should answer a matching If-None-Match with not modified"""
+        prod = self._create_products_bulk()[0]
+        result_read = self.client.get(f"{BASE_URL}/{prod.id}")
+        etag = result_read.headers.get("ETag")
+        self.assertIsNotNone(etag)
+        result_read = self.client.get(f"{BASE_URL}/{prod.id}", headers={"If-None-Match": etag})
+        self.assertEqual(result_read.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(result_read.data, b"")
+
     def test_get_product_not_found(self):
         """it should test read process not found"""
         result_read = self.client.get(f"{BASE_URL}/22")
         self.assertEqual(result_read.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_product_bad_id(self):
+        """it should return not found for a non numeric id"""
+        result_read = self.client.get(f"{BASE_URL}/abc")
+        self.assertEqual(result_read.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_update_product(self):
         """it should test update process by create and change value and verify """
-        prod = self._create_products()[0]
+        prod = self._create_products_bulk()[0]
         #update product
         prod.description = "new_description_for_test"
         result_upt = self.client.put(f"{BASE_URL}/{prod.id}",json=prod.serialize())
         self.assertEqual(result_upt.status_code,status.HTTP_200_OK) 
         self.assertEqual(result_upt.get_json()["description"],"new_description_for_test")
 
+    def test_read_after_update(self):
+        """it should not return a stale cached product after an update"""
+        prod = self._create_products_bulk()[0]
+        result_read = self.client.get(f"{BASE_URL}/{prod.id}")
+        self.assertEqual(result_read.status_code, status.HTTP_200_OK)
+        prod.description = "updated_after_read"
+        result_upt = self.client.put(f"{BASE_URL}/{prod.id}", json=prod.serialize())
+        self.assertEqual(result_upt.status_code, status.HTTP_200_OK)
+        result_read = self.client.get(f"{BASE_URL}/{prod.id}")
+        self.assertEqual(result_read.get_json()["description"], "updated_after_read")
+
     def test_can_not_update(self):
         """it should fail by id bad request and not found"""
         #try with bad product_id
         result_not_found = self.client.put(f"{BASE_URL}/22",json=ProductFactory().serialize())
         self.assertEqual(result_not_found.status_code,status.HTTP_404_NOT_FOUND)
         #try to update a true product but by bad request , (empty json)
-        prod = self._create_products()[0]
+        prod = self._create_products_bulk()[0]
         result_bad_request = self.client.put(f"{BASE_URL}/{prod.id}",json={})
         self.assertEqual(result_bad_request.status_code,status.HTTP_400_BAD_REQUEST)
 
     def test_delete_product(self):
         """it should test delete route """
-        prod = self._create_products()[0]
+        prod = self._create_products_bulk()[0]
         #start deletion
         result_delete = self.client.delete(f"{BASE_URL}/{prod.id}")
         self.assertEqual(result_delete.status_code,status.HTTP_204_NO_CONTENT)
@@ -229,14 +269,14 @@ class TestProductRoutes(TestCase):
 
     def test_list_all_products(self):
         """should list all products"""
-        prods = self._create_products(10)
+        prods = self._create_products_bulk(10)
         result_list = self.client.get(f"{BASE_URL}")
         self.assertEqual(result_list.status_code,status.HTTP_200_OK)
         self.assertEqual(len(result_list.get_json()),10)
 
     def test_list_by_name(self):
         """should list by name testing"""
-        prods = self._create_products(10)
+        prods = self._create_products_bulk(10)
         name_t = prods[0].name
         numberOccurence = len([prod for prod in prods if prod.name == name_t])
         response = self.client.get(
@@ -245,9 +285,51 @@ class TestProductRoutes(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.get_json()),numberOccurence)
 
+    def test_list_after_write(self):
+        """should not return a stale cached list after a write"""
+        self._create_products_bulk(3)
+        response = self.client.get(BASE_URL)
+        self.assertEqual(len(response.get_json()), 3)
+        self._create_products()
+        response = self.client.get(BASE_URL)
+        self.assertEqual(len(response.get_json()), 4)
+
+    def _get_list_etag(self):
+        """GETs the list and returns the ETag it was served with"""
+        response = self.client.get(BASE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag)
+        return etag
+
+    def test_list_not_modified(self):
+        """should answer a matching If-None-Match on the list with not modified"""
+        self._create_products_bulk(3)
+        etag = self._get_list_etag()
+        response = self.client.get(BASE_URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.data, b"")
+
+    def test_list_etag_changes_after_write(self):
+        """should give the list a new ETag after a write"""
+        self._create_products_bulk(3)
+        etag = self._get_list_etag()
+        self._create_products()
+        self.assertNotEqual(self._get_list_etag(), etag)
+        response = self.client.get(BASE_URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.get_json()), 4)
+
+    def test_list_by_name_not_found(self):
+        """should list nothing for a name no product has"""
+        self._create_products_bulk(3)
+        response = self.client.get(BASE_URL, query_string="name=Unicorn")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.get_json(), [])
+
     def test_list_by_category(self):
         """should list by category testing"""
-        prods = self._create_products(10)
+        prods = self._create_products_bulk(10)
         category_t = prods[0].category.name
         numberOccurence = len([prod for prod in prods if prod.category.name == category_t])
         response = self.client.get(
@@ -256,9 +338,14 @@ class TestProductRoutes(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.get_json()),numberOccurence)
 
+    def test_list_by_unknown_category(self):
+        """should not list by an unknown category"""
+        response = self.client.get(BASE_URL, query_string="category=SHOES")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_list_by_available(self):
         """should list by available testing"""
-        prods = self._create_products(10)
+        prods = self._create_products_bulk(10)
         ava_t = prods[0].available
         numberOccurence = len([prod for prod in prods if prod.available == ava_t])
         response = self.client.get(